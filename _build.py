@@ -0,0 +1,37 @@
+""" Compile prim_csr ahead of time into the prim_aot extension module.
+
+Run `python _build.py` once; "prims algorithm.py" then imports prim_csr from
+prim_aot instead of compiling it with numba when it starts.
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+
+#numba's on-disk cache records the module name, and the script is loaded
+#under a different one here than when it is run, so keep this run's cache
+#out of the way
+os.environ["NUMBA_CACHE_DIR"] = tempfile.mkdtemp()
+
+from numba.pycc import CC
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+#the script name has a space in it, so it has to be loaded by path
+spec = importlib.util.spec_from_file_location(
+    "prims_algorithm", os.path.join(HERE, "prims algorithm.py"))
+prims = importlib.util.module_from_spec(spec)
+sys.modules["prims_algorithm"] = prims
+spec.loader.exec_module(prims)
+
+cc = CC('prim_aot')
+cc.output_dir = HERE
+
+#same signature as the jit version, so the two are interchangeable
+cc.export('prim_csr', 'i8[:](i4[:], i4[:], i4[:], i8)')(prims._prim_csr)
+
+if __name__ == "__main__":
+    cc.compile()
+    #record what was compiled, so the script can tell when the build is stale
+    with open(os.path.join(HERE, 'prim_aot.sha256'), 'w') as f:
+        f.write(prims._prim_csr_source_hash())
@@ -75,6 +75,8 @@ class Graph:
    
     def __init__(self):
         self._structure = dict()
+        self._label_to_vertex = dict()   #element -> vertex, for O(1) lookups
+        self._num_edges = 0
 
     def __str__(self):
         """ Return a string representation of the graph. """
@@ -83,7 +85,7 @@ class Graph:
         vstr = '\nVertices: '
         for v in self._structure:
             vstr += str(v) + '-'
-        edges = self.edges()
+        edges = self.iter_edges()
         estr = '\nEdges: '
         for e in edges:
             estr += str(e) + ' '
@@ -98,31 +100,26 @@ class Graph:
 
     def num_edges(self):
         """ Return the number of edges in the graph. """
-        num = 0
-        for v in self._structure:
-            num += len(self._structure[v])    #the dict of edges for v
-        return num //2     #divide by 2, since each edege appears in the
-                           #vertex list for both of its vertices
+        return self._num_edges
 
     def vertices(self):
-        """ Return a list of all vertices in the graph. """
-        return [key for key in self._structure]
+        """ Return a view of all vertices in the graph. """
+        return self._structure.keys()
 
     def get_vertex_by_label(self, element):
-        for v in self._structure:
-            if v.element() == element:
-                return v
-        return None
+        return self._label_to_vertex.get(element)
 
     def edges(self):
         """ Return a list of all edges in the graph. """
-        edgelist = []
+        return list(self.iter_edges())
+
+    def iter_edges(self):
+        """ Yield each edge in the graph once. """
         for v in self._structure:
-            for w in self._structure[v]:
+            for e in self._structure[v].values():
                 #to avoid duplicates, only return if v is the first vertex
-                if self._structure[v][w].start() == v:
-                    edgelist.append(self._structure[v][w])
-        return edgelist
+                if e.start() == v:
+                    yield e
 
     def get_edges(self, v):
         """ Return a list of all edges incident on v.
@@ -155,30 +152,128 @@ class Graph:
 
         v = Vertex(element)
         self._structure[v] = dict()  # create an empty dict, ready for edges
+        self._label_to_vertex.setdefault(element, v)  #keep the first one, as a scan would
         return v
 
     def add_vertex_if_new(self, element):
 
-        for v in self._structure:
-            if v.element() == element:
-                #print('Already there')
-                return v
+        v = self._label_to_vertex.get(element)
+        if v is not None:
+            #print('Already there')
+            return v
         return self.add_vertex(element)
 
     def add_edge(self, v, w, element):
 
         if not v in self._structure or not w in self._structure:
             return None
+        if not w in self._structure[v]:
+            self._num_edges += 1
         e = Edge(v, w, element)
         self._structure[v][w] = e
         self._structure[w][v] = e
         return e
 
+    def remove_edge(self, v, w):
+        """ Remove the edge between v and w and return it, or None, if there
+        is no edge.
+        """
+        e = self.get_edge(v, w)
+        if e is None:
+            return None
+        del self._structure[v][w]
+        if v is not w:      #a self loop has only the one entry
+            del self._structure[w][v]
+        self._num_edges -= 1
+        return e
+
+    def add_edges_bulk(self, vs, ws, elements):
+        """ Add an edge between vs[i] and ws[i] with label elements[i], for all i.
+
+        The vertices are assumed to be in the graph already and the pairs to
+        be new, so the checks done by add_edge are skipped.
+        """
+        structure = self._structure
+        for v, w, element in zip(vs, ws, elements):
+            e = Edge(v, w, element)
+            structure[v][w] = e
+            structure[w][v] = e
+            self._num_edges += 1
+
     def add_edge_pairs(self, elist):
         """ Add all vertex pairs in elist as edges with empty elements. """
         for (v,w) in elist:
             self.add_edge(v,w,None)
 
+    #--------------------------------------------------#
+    #Conversion to flat arrays for the Prim hot loop
+
+    def weight_dtype(self):
+        """ Return a numpy dtype that holds every edge element exactly.
+
+        This is int32 when the elements are integers that fit, so they can go
+        to the compiled Prims, and otherwise the dtype numpy picks for them,
+        e.g. float64. Raise ValueError if the elements are not numbers.
+        """
+        elements = np.asarray([e._element for e in self.iter_edges()])
+        if len(elements) == 0:
+            return np.dtype(np.int32)
+        if elements.dtype.kind in 'iub':
+            info = np.iinfo(np.int32)
+            if info.min <= elements.min() and elements.max() <= info.max:
+                return np.dtype(np.int32)
+            return elements.dtype
+        if elements.dtype.kind == 'f':
+            return elements.dtype
+        raise ValueError("edge elements must be numbers to be used as weights")
+
+    def to_csr(self):
+        """ Return the graph in CSR form, as (indptr, neighbors, weights).
+
+        Vertices are numbered in the order given by vertices(). The
+        neighbours of vertex i are neighbors[indptr[i]:indptr[i+1]], and
+        weights holds the matching edge elements, with the dtype given by
+        weight_dtype().
+        """
+        ids = {}
+        for v in self._structure:
+            ids[v] = len(ids)
+
+        #count the degree of each vertex, then cumsum into offsets
+        indptr = np.zeros(len(ids) + 1, dtype=np.int32)
+        for v in self._structure:
+            indptr[ids[v] + 1] = len(self._structure[v])
+        np.cumsum(indptr, out=indptr)
+
+        neighbors = np.empty(indptr[-1], dtype=np.int32)
+        weights = np.empty(indptr[-1], dtype=self.weight_dtype())
+        for v in self._structure:
+            k = indptr[ids[v]]
+            for w in self._structure[v]:
+                neighbors[k] = ids[w]
+                weights[k] = self._structure[v][w]._element
+                k += 1
+
+        return indptr, neighbors, weights
+
+    def to_dense(self):
+        """ Return the graph as a V x V matrix of edge elements, with INF
+        where there is no edge. Vertices are numbered as in to_csr().
+        """
+        #the matrix is int64, which would silently truncate other weights
+        if self.weight_dtype().kind not in 'iub':
+            raise ValueError("to_dense needs integer edge weights")
+
+        ids = {}
+        for v in self._structure:
+            ids[v] = len(ids)
+
+        W = np.full((len(ids), len(ids)), INF, dtype=np.int64)
+        for v in self._structure:
+            for w in self._structure[v]:
+                W[ids[v], ids[w]] = self._structure[v][w]._element
+        return W
+
     #--------------------------------------------------#
     #Additional methods to explore the graph
         
@@ -194,74 +289,140 @@ class Graph:
     
 
     
-def make_random_graph(n_vertices, m_edges):
+class IntGraph:
+    """ A graph on the vertices 0..n-1, stored as three parallel int32
+    arrays: edge i joins src[i] and dst[i] and has weight w[i].
+    """
 
-    #for random picking of vertices
-    import random
+    def __init__(self, n_vertices, src, dst, w):
+        self._n = n_vertices
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.w = np.asarray(w, dtype=np.int32)
+
+    def __str__(self):
+        """ Return a string representation of the graph. """
+        return str(self.to_graph())
+
+    def num_vertices(self):
+        """ Return the number of vertices in the graph. """
+        return self._n
+
+    def num_edges(self):
+        """ Return the number of edges in the graph. """
+        return len(self.src)
+
+    def _simple_edges(self):
+        """ Return the edges as (src, dst, w) with src < dst, self loops
+        dropped and parallel edges reduced to the cheapest one, which is the
+        only one of them that can be in a minimum spanning tree.
+        """
+        src = np.minimum(self.src, self.dst)
+        dst = np.maximum(self.src, self.dst)
+        keep = src != dst
+        src, dst, w = src[keep], dst[keep], self.w[keep]
+
+        #sort by pair, cheapest first, and keep the first edge of each pair
+        order = np.lexsort((w, dst, src))
+        src, dst, w = src[order], dst[order], w[order]
+        first = np.ones(len(src), dtype=bool)
+        first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        return src[first], dst[first], w[first]
+
+    def to_csr(self):
+        """ Return the graph in CSR form, as (indptr, neighbors, weights),
+        laid out as in Graph.to_csr().
+        """
+        src, dst, w = self._simple_edges()
+
+        #each edge appears in the rows of both of its vertices
+        rows = np.concatenate((src, dst))
+        cols = np.concatenate((dst, src))
+        vals = np.concatenate((w, w))
+
+        if sp is None:
+            order = np.argsort(rows, kind='stable')
+            indptr = np.zeros(self._n + 1, dtype=np.int32)
+            np.cumsum(np.bincount(rows, minlength=self._n), out=indptr[1:])
+            return indptr, cols[order], vals[order]
+
+        #scipy does the bucketing into rows in C; the pairs are unique now,
+        #so it has no duplicates to sum
+        csr = sp.coo_array((vals, (rows, cols)), shape=(self._n, self._n)).tocsr()
+        return (csr.indptr.astype(np.int32, copy=False),
+                csr.indices.astype(np.int32, copy=False),
+                csr.data.astype(np.int32, copy=False))
+
+    def to_dense(self):
+        """ Return the graph as a matrix, laid out as in Graph.to_dense(). """
+        src, dst, w = self._simple_edges()
+        W = np.full((self._n, self._n), INF, dtype=np.int64)
+        W[src, dst] = w
+        W[dst, src] = w
+        return W
+
+    def to_graph(self):
+        """ Return the same graph as a Graph of Vertex and Edge objects,
+        with vertex i labelled i.
+        """
+        src, dst, w = self._simple_edges()
+        my_graph = Graph()
+        vertices_list = [my_graph.add_vertex(x) for x in range(self._n)]
+        my_graph.add_edges_bulk([vertices_list[i] for i in src.tolist()],
+                                [vertices_list[j] for j in dst.tolist()],
+                                w.tolist())
+        return my_graph
+
+
+def _row_start(i, n):
+    """ Return the number of pairs (a, b), a < b < n, with a < i, i.e. the
+    index of the first pair in row i when the pairs are numbered row by row.
+    """
+    return i*n - i*(i+1)//2
+
+def _pair_from_index(k, n):
+    """ Return the pairs (i, j), i < j < n, numbered k in row-by-row order. """
+    #invert _row_start with the quadratic formula, then fix any rounding
+    i = np.floor(((2*n-1) - np.sqrt((2*n-1)**2 - 8*k.astype(np.float64))) / 2).astype(np.int64)
+    i = np.where(_row_start(i, n) > k, i-1, i)
+    i = np.where(_row_start(i+1, n) <= k, i+1, i)
+    return i, k - _row_start(i, n) + i + 1
+
+def make_random_int_graph(n_vertices, m_edges):
 
     #make sure the number of edges isnt too big
     while m_edges > n_vertices * (n_vertices-1) / 2:
         m_edges = int(input("Please put a smaller number of edges: "))
 
-    #initialise some stuff
-    vertices_list = []
-    my_graph=Graph()
-
-    #add a vertex n times
-    for x in range(n_vertices):
-        #make it and add to list
-        vertex = my_graph.add_vertex(x)
-        vertices_list.append(vertex)
-        #if its not the first vertex, connect it to a random one
-        if x > 0:
-            #pick random form list not including the one u just added
-            vertex2 = random.randint(0,x-1)
-            #get the vertex
-            vertex2 = vertices_list[vertex2]
-            #add an edge between them to connect the graph
-            value = random.randint(1,20)
-            my_graph.add_edge(vertex2, vertex, value)
-
-    #now add edges until number of edges reached
-    for y in range(m_edges-(n_vertices-1)):
-
-        #pick two random points
-        vertex1 = random.randint(0, n_vertices-1)
-        vertex2 = random.randint(0,n_vertices-1)
-
-        #make into vertices
-        vertex1 = vertices_list[vertex1]
-        vertex2 = vertices_list[vertex2]
-        
-        #check not the same
-        while vertex1 == vertex2:
-            vertex2 = random.randint(0, n_vertices-1)
-            vertex2 = vertices_list[vertex2]
-
-        #make sure that vertex 1 isnt fully connected before u loop through
-        #trying to connect it to something
-        max_edges = n_vertices-1
-        while my_graph.degree(vertex1) == max_edges:
-            vertex1 = random.randint(0,n_vertices-1)
-            vertex1 = vertices_list[vertex1]
-        
-        #make sure theyre not connected, or the same
-        #if theyre connected or if the are the same, pick a new second vertex
-        check_var = my_graph.get_edge(vertex1, vertex2)
-        while check_var != None or vertex2._element == vertex1._element:
-            vertex2 = random.randint(0,n_vertices-1)
-            vertex2 = vertices_list[vertex2]
-            check_var = my_graph.get_edge(vertex1, vertex2)
-        
-        #finally get a random value and add an edge between the points
-        value = random.randint(1,20)
-        my_graph.add_edge(vertex2, vertex1, value)
+    rng = np.random.default_rng()
+
+    #connect every vertex after the first to a random earlier one, so the
+    #graph is connected
+    dst = np.arange(1, n_vertices, dtype=np.int64)
+    src = rng.integers(0, dst)
+
+    #number the pairs i<j row by row, and pick the remaining edges in one go
+    #as ranks among the pairs not used yet; no n x n matrix is built and
+    #nothing is ever rejected and redrawn
+    n_pairs = n_vertices * (n_vertices-1) // 2
+    used = np.sort(_row_start(src, n_vertices) + dst - src - 1)
+    ranks = rng.choice(n_pairs - len(used), size=max(m_edges-len(dst), 0), replace=False)
+    #shift each rank past the used pairs at or below it
+    picks = ranks + np.searchsorted(used - np.arange(len(used)), ranks, side='right')
+    extra_src, extra_dst = _pair_from_index(picks, n_vertices)
 
-    return my_graph
+    src = np.concatenate((src, extra_src))
+    dst = np.concatenate((dst, extra_dst))
+    values = rng.integers(1, 21, size=len(src))
+
+    return IntGraph(n_vertices, src, dst, values)
+
+def make_random_graph(n_vertices, m_edges):
+    return make_random_int_graph(n_vertices, m_edges).to_graph()
 
 class Element:
     """ A key, value and index. """
-    def __init__(self, k, v, i):
+    def __init__(self, k, v, i=None):
         self._key = k
         self._value = v
         self._index = i
@@ -281,6 +442,7 @@ class Priority_Queue_Heap:
 
     def __init__(self):
         self._heap = []
+        self._pos = {}      #element -> its index in self._heap
 
     def __str__(self):
         string = "[ "
@@ -294,150 +456,86 @@ class Priority_Queue_Heap:
         return len(self._heap)
 
     def bubble_up(self, index):
+        heap = self._heap
+        pos = self._pos
 
         #while the node has a key smaller than its parent and it isn't at the front of the list
-        while self._heap[index]._key < self._heap[(index-1)//2]._key and index !=0:
-            #swap their indexes
-            self._heap[index]._index ,self._heap[(index-1)//2]._index = self._heap[(index-1)//2]._index ,self._heap[index]._index
-            #swap them
-            self._heap[index], self._heap[(index-1)//2] = self._heap[(index-1)//2], self._heap[index]
-            
-            #update current index for next iteration
-            index=(index-1)//2
-
-        #return self._heap
-
-    def bubble_down(self, current_i):
-        length = len(self._heap) - 1
-        while current_i <= (length-1):
-
-            lc = (2*current_i)+1                   #get the kids
-            rc = (2*current_i)+2
-
-            if lc > (length -1) and rc > (length -1):      #if no children, break as sorted
+        while index > 0:
+            parent = (index-1)//2
+            if heap[parent]._key <= heap[index]._key:
                 break
-
-            elif lc > (length -1):                          #if no left, therefore only a right
-                if self._heap[current_i] > self._heap[rc]:              #if less than right, swap
-
-                    #index swapping
-                    self._heap[current_i]._index, self._heap[(2*current_i)+2]._index = self._heap[(2*current_i)+2]._index, self._heap[current_i]._index
-
-                    #normal swapping
-                    temp = self._heap[current_i]
-                    self._heap[current_i] = self._heap[(2*current_i)+2]
-                    self._heap[(2*current_i)+2] = temp
-                    
-
-                    current_i = (2*current_i)+2
-                else:                                       #else break as done
-                    break
-
-            elif rc > (length -1):                          #if no right, and smaller than left, swap
-                if self._heap[current_i] > self._heap[lc]:
-                    #index swapping
-                    self._heap[current_i]._index, self._heap[(2*current_i)+1]._index = self._heap[(2*current_i)+1]._index, self._heap[current_i]._index
-
-                    #normal swapping
-                    temp = self._heap[current_i]
-                    self._heap[current_i] = self._heap[(2*current_i)+1]
-                    self._heap[(2*current_i)+1] = temp
-
-                    current_i = (2*current_i)+1
-                else:                                       #else break as done sorting
-                    break
-
-            elif self._heap[current_i] > self._heap[lc] and self._heap[current_i] > self._heap[rc]: #if smaller than both left and right
-
-                if self._heap[lc] < self._heap[rc]:                     #if left greater than right, swap with left
-
-                    #index swapping
-                    self._heap[current_i]._index, self._heap[(2*current_i)+1]._index = self._heap[(2*current_i)+1]._index, self._heap[current_i]._index
-
-                    #normal swapping
-                    temp = self._heap[current_i]
-                    self._heap[current_i] = self._heap[(2*current_i)+1]
-                    self._heap[(2*current_i)+1] = temp
-                    current_i = (2*current_i)+1
-
-                else:                                       #else if right greater than left, swap with right
-                    #index swapping
-                    self._heap[current_i]._index, self._heap[(2*current_i)+2]._index = self._heap[(2*current_i)+2]._index, self._heap[current_i]._index
-
-                    #normal swapping
-                    temp = self._heap[current_i]
-                    self._heap[current_i] = self._heap[(2*current_i)+2]
-                    self._heap[(2*current_i)+2] = temp
-
-                    current_i = (2*current_i)+2
-
-            elif self._heap[current_i] > self._heap[lc]:            #if smaller than left, swap with left
-
-                #index swapping
-                self._heap[current_i]._index, self._heap[(2*current_i)+1]._index = self._heap[(2*current_i)+1]._index, self._heap[current_i]._index
-
-                #normal swapping
-                temp = self._heap[current_i]
-                self._heap[current_i] = self._heap[(2*current_i)+1]
-                self._heap[(2*current_i)+1] = temp
-
-                current_i = (2*current_i)+1
-
-            elif self._heap[current_i] > self._heap[rc]:            #if smaller than right, swap with right
-                
-                #index swapping
-                self._heap[current_i]._index, self._heap[(2*current_i)+2]._index = self._heap[(2*current_i)+2]._index, self._heap[current_i]._index
-
-                #normal swapping
-                temp = self._heap[current_i]
-                self._heap[current_i] = self._heap[(2*current_i)+2]
-                self._heap[(2*current_i)+2] = temp
-
-                current_i = (2*current_i)+2                 #reset new current index to keep sorting
-            
-            else:
+            heap[index], heap[parent] = heap[parent], heap[index]
+            pos[heap[index]] = index
+            pos[heap[parent]] = parent
+            index = parent
+
+    def bubble_down(self, index):
+        heap = self._heap
+        pos = self._pos
+        length = len(heap)
+
+        #swap with the smaller kid while it is smaller than the node
+        while (lc := 2*index+1) < length:
+            rc = lc+1
+            kid = lc if rc >= length or heap[lc]._key <= heap[rc]._key else rc
+            if heap[index]._key <= heap[kid]._key:
                 break
+            heap[index], heap[kid] = heap[kid], heap[index]
+            pos[heap[index]] = index
+            pos[heap[kid]] = kid
+            index = kid
 
     def add(self, key, item):
-        elem = Element(key, item, len(self._heap))
+        elem = Element(key, item)
+        self._pos[elem] = len(self._heap)
         self._heap.append(elem)
-        self.bubble_up(elem._index)
+        self.bubble_up(self._pos[elem])
         return elem
 
+    def add_all(self, pairs):
+        """ Add every (key, item) in pairs and return the new elements.
+
+        The elements are appended as they are and then heapified bottom up,
+        which is O(n) instead of n separate bubble_ups.
+        """
+        elems = []
+        for key, item in pairs:
+            elem = Element(key, item)
+            self._pos[elem] = len(self._heap)
+            self._heap.append(elem)
+            elems.append(elem)
+        for index in range(len(self._heap)//2 - 1, -1, -1):
+            self.bubble_down(index)
+        return elems
+
     def min(self):
         return self._heap[0]
 
     def remove_min(self):
-        #and their indexes
-
-        self._heap[0]._index, self._heap[-1]._index = self._heap[-1]._index, self._heap[0]._index
-        #swap 1st and last
-        self._heap[0], self._heap[-1] = self._heap[-1], self._heap[0]
-   
-        self.bubble_down(0)
-        return self._heap.pop()
+        return self.remove(self._heap[0])
 
     def update_key(self, elem, new_key):
+        index = self._pos[elem]
         elem._key = new_key
 
-        if elem._key < self._heap[((elem._index)-1)//2]._key:
-            self.bubble_up(elem._index)
+        if index > 0 and new_key < self._heap[(index-1)//2]._key:
+            self.bubble_up(index)
 
         else:
-            self.bubble_down(elem._index)
+            self.bubble_down(index)
 
     def get_key(self, elem):
         return elem._key
 
     def remove(self, elem):
-        #and their indexes
-        indexx= elem._index
-        self._heap[elem._index]._index, self._heap[-1]._index = self._heap[-1]._index, self._heap[elem._index]._index
-        #swap 1st and last
-        self._heap[indexx], self._heap[-1] = self._heap[-1],  self._heap[indexx]
-        
-        self.bubble_down(indexx)
-        return self._heap.pop()
+        #move the last element into elem's place, then restore the heap there
+        index = self._pos.pop(elem)
+        last = self._heap.pop()
+        if last is not elem:
+            self._heap[index] = last
+            self._pos[last] = index
+            self.update_key(last, last._key)
+        return elem
 
 
 class Priority_Queue_List:
@@ -471,12 +569,19 @@ class Priority_Queue_List:
         return min_elem
 
     def remove_min(self):
-        minn_elem = self.min()
-        ans = self.remove(minn_elem)
-        return minn_elem
+        #find the min and swap it to the end in one pass, then pop it
+        pq_list = self._pq_list
+        min_i = 0
+        for i in range(1, len(pq_list)):
+            if pq_list[i]._key < pq_list[min_i]._key:
+                min_i = i
+        pq_list[min_i], pq_list[-1] = pq_list[-1], pq_list[min_i]
+        pq_list[min_i]._index = min_i
+        return pq_list.pop()
 
     def update_key(self, elem, new_key):
-        self._pq_list[self._pq_list.index(elem)] = (new_key,elem)
+        #the list is unsorted, so the key can just be changed in place
+        elem._key = new_key
 
     def get_key(self, elem):
         return elem._key
@@ -490,18 +595,43 @@ class Priority_Queue_List:
         element = self._pq_list.pop(-1)
 
 import math
+import heapq
+import warnings
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+except ImportError:
+    #without scipy, IntGraph.to_csr buckets the edges with numpy instead
+    sp = None
+
+try:
+    from numba import njit
+except ImportError:
+    #without numba the compiled functions below run as plain python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 
 def prim_w_list(my_graph):
 
     pq = Priority_Queue_List()
     locs ={}
+    ids = {}    #vertex -> its number, in vertices() order as in to_csr()
 
     for vertex in my_graph.vertices():
         elem = pq.add(math.inf, (vertex, None))
         locs[vertex] = elem
-   
-    tree = []
+        ids[vertex] = len(ids)
+
+    #rows of (parent, vertex, weight), filled in as vertices join the tree;
+    #wide enough to hold the weights exactly
+    tree = np.empty((max(my_graph.num_vertices()-1, 0), 3),
+                    np.result_type(np.int32, my_graph.weight_dtype()))
+    ti = 0
 
     while pq.length() > 0:
         
@@ -514,7 +644,8 @@ def prim_w_list(my_graph):
         del locs[vertex]
                 
         if edge is not None:
-            tree.append(str(edge))
+            tree[ti] = (ids[edge.opposite(vertex)], ids[vertex], cost)
+            ti += 1
 
         for edge in my_graph.get_edges(vertex):
 
@@ -524,22 +655,29 @@ def prim_w_list(my_graph):
                 cost = edge._element
 
                 if cost < pq.get_key(locs[other_vertex]):
-                    pq.remove(locs[other_vertex])
-                    new = pq.add(cost, (other_vertex,edge))
-                    locs[other_vertex] = new
+                    pq.update_key(locs[other_vertex], cost)
+                    locs[other_vertex]._value = (other_vertex, edge)
 
-    print("WHAT", tree)
+    return tree[:ti]
 
-def prim_w_heap(my_graph):
+def prim_w_pqheap(my_graph):
 
     pq = Priority_Queue_Heap()
     locs ={}
+    ids = {}    #vertex -> its number, in vertices() order as in to_csr()
 
-    for vertex in my_graph.vertices():
-        elem = pq.add(math.inf, (vertex, None))
+    #every key starts at infinity, so build the heap in one O(V) pass
+    vertices = list(my_graph.vertices())
+    elems = pq.add_all([(math.inf, (vertex, None)) for vertex in vertices])
+    for vertex, elem in zip(vertices, elems):
         locs[vertex] = elem
-   
-    tree = []
+        ids[vertex] = len(ids)
+
+    #rows of (parent, vertex, weight), filled in as vertices join the tree;
+    #wide enough to hold the weights exactly
+    tree = np.empty((max(my_graph.num_vertices()-1, 0), 3),
+                    np.result_type(np.int32, my_graph.weight_dtype()))
+    ti = 0
 
     while pq.length() > 0:
         
@@ -552,7 +690,8 @@ def prim_w_heap(my_graph):
         del locs[vertex]
                 
         if edge is not None:
-            tree.append(str(edge))
+            tree[ti] = (ids[edge.opposite(vertex)], ids[vertex], cost)
+            ti += 1
 
         for edge in my_graph.get_edges(vertex):
 
@@ -562,27 +701,333 @@ def prim_w_heap(my_graph):
                 cost = edge._element
 
                 if cost < pq.get_key(locs[other_vertex]):
-                    pq.remove(locs[other_vertex])
-                    new = pq.add(cost, (other_vertex,edge))
-                    locs[other_vertex] = new
+                    pq.update_key(locs[other_vertex], cost)
+                    locs[other_vertex]._value = (other_vertex, edge)
+
+    return tree[:ti]
+
+def prim_w_heap(indptr, neighbors, weights):
+
+    #the arrays come from Graph.to_csr(); plain lists index faster than
+    #numpy arrays from python code
+    tree_dtype = np.result_type(np.int32, weights.dtype)
+    indptr = indptr.tolist()
+    neighbors = neighbors.tolist()
+    weights = weights.tolist()
+    n = len(indptr) - 1
+
+    #heapq with lazy deletion: push a fresh entry on every improvement and
+    #skip the stale ones when they are popped, instead of remove + add
+    pq = []
+    in_tree = [False] * n
+
+    #rows of (parent, vertex, weight), filled in as vertices join the tree
+    tree = np.empty((max(n-1, 0), 3), tree_dtype)
+    ti = 0
+
+    #restart from the next vertex not in the tree whenever the heap runs
+    #dry, so a disconnected graph gives a spanning forest
+    for start in range(n):
+
+        if in_tree[start]:
+            continue
+        heapq.heappush(pq, (0, start, -1))
+
+        while pq:
+
+            cost, vertex, parent = heapq.heappop(pq)
+
+            if in_tree[vertex]:
+                continue
+            in_tree[vertex] = True
+
+            if parent != -1:
+                tree[ti] = (parent, vertex, cost)
+                ti += 1
+
+            for k in range(indptr[vertex], indptr[vertex+1]):
+
+                other_vertex = neighbors[k]
+
+                if not in_tree[other_vertex]:
+                    heapq.heappush(pq, (weights[k], other_vertex, vertex))
+
+    return tree[:ti]
+
+
+def prim_w_cheap(indptr, neighbors, weights):
 
-    print("WHATTTT", tree)
+    #CHeap is the cython heap in priority_queue_heap.pyx; it needs
+    #pyximport.install() (or a compiled build) before this import works
+    from priority_queue_heap import CHeap
+
+    #CHeap keys are C longs, which would silently truncate other weights
+    if weights.dtype.kind not in 'iub':
+        raise ValueError("prim_w_cheap needs integer edge weights")
+
+    indptr = indptr.tolist()
+    neighbors = neighbors.tolist()
+    weights = weights.tolist()
+    n = len(indptr) - 1
+
+    #CHeap only holds (long, long) pairs, so the parent travels in a side
+    #array: best/parent change together, and the first pop of a vertex
+    #always carries its current best
+    pq = CHeap(n)
+    best = [math.inf] * n
+    parent = [-1] * n
+    in_tree = [False] * n
+
+    #rows of (parent, vertex, weight), filled in as vertices join the tree
+    tree = np.empty((max(n-1, 0), 3), np.int32)
+    ti = 0
+
+    #restart from the next vertex not in the tree whenever the heap runs
+    #dry, so a disconnected graph gives a spanning forest
+    for start in range(n):
+
+        if in_tree[start]:
+            continue
+        best[start] = 0
+        pq.push(0, start)
+
+        while len(pq) > 0:
+
+            cost, vertex = pq.pop()
+
+            if in_tree[vertex]:
+                continue
+            in_tree[vertex] = True
+
+            if parent[vertex] != -1:
+                tree[ti] = (parent[vertex], vertex, cost)
+                ti += 1
+
+            for k in range(indptr[vertex], indptr[vertex+1]):
+
+                other_vertex = neighbors[k]
+
+                if not in_tree[other_vertex] and weights[k] < best[other_vertex]:
+                    best[other_vertex] = weights[k]
+                    parent[other_vertex] = vertex
+                    pq.push(weights[k], other_vertex)
+
+    return tree[:ti]
+
+
+#larger than any edge weight, used as the key of vertices not yet reached
+INF = np.iinfo(np.int64).max
+
+
+@njit(cache=True)
+def _sift_up(heap_key, heap_vtx, heap_pos, i):
+    """ Move the entry at i up the array heap until its parent is smaller. """
+    while i > 0:
+        p = (i-1)//2
+        if heap_key[p] <= heap_key[i]:
+            break
+        heap_key[i], heap_key[p] = heap_key[p], heap_key[i]
+        heap_vtx[i], heap_vtx[p] = heap_vtx[p], heap_vtx[i]
+        heap_pos[heap_vtx[i]] = i
+        heap_pos[heap_vtx[p]] = p
+        i = p
+
+
+@njit(cache=True)
+def _sift_down(heap_key, heap_vtx, heap_pos, i, size):
+    """ Move the entry at i down the array heap until both kids are bigger. """
+    while 2*i+1 < size:
+        c = 2*i+1
+        if c+1 < size and heap_key[c+1] < heap_key[c]:
+            c += 1
+        if heap_key[i] <= heap_key[c]:
+            break
+        heap_key[i], heap_key[c] = heap_key[c], heap_key[i]
+        heap_vtx[i], heap_vtx[c] = heap_vtx[c], heap_vtx[i]
+        heap_pos[heap_vtx[i]] = i
+        heap_pos[heap_vtx[c]] = c
+        i = c
+
+
+def _prim_csr(indptr, neighbors, weights, n):
+    """ Run Prim on the CSR arrays from Graph.to_csr() and return the parent
+    of each vertex in the tree (-1 for the root).
+
+    The queue is a binary heap kept in the arrays heap_key and heap_vtx, with
+    heap_pos[v] giving the position of v so its key can be decreased in place.
+    """
+    best = np.full(n, INF, np.int64)
+    parent = np.full(n, -1, np.int64)
+    in_tree = np.zeros(n, np.bool_)
+
+    #every vertex starts in the heap with key INF, except vertex 0 which is
+    #at the root with key 0, so the arrays are already a valid heap
+    heap_key = np.full(n, INF, np.int64)
+    heap_vtx = np.arange(n)
+    heap_pos = np.arange(n)
+    size = n
+    if n > 0:
+        best[0] = 0
+        heap_key[0] = 0
+
+    while size > 0:
+
+        #pop the root, move the last entry up there and sift it down
+        vertex = heap_vtx[0]
+        size -= 1
+        heap_key[0] = heap_key[size]
+        heap_vtx[0] = heap_vtx[size]
+        heap_pos[heap_vtx[0]] = 0
+        _sift_down(heap_key, heap_vtx, heap_pos, 0, size)
+
+        in_tree[vertex] = True
+
+        for k in range(indptr[vertex], indptr[vertex+1]):
+
+            other_vertex = neighbors[k]
+
+            if not in_tree[other_vertex] and weights[k] < best[other_vertex]:
+                best[other_vertex] = weights[k]
+                parent[other_vertex] = vertex
+                heap_key[heap_pos[other_vertex]] = weights[k]
+                _sift_up(heap_key, heap_vtx, heap_pos, heap_pos[other_vertex])
+
+    return parent
+
+
+def _prim_csr_source_hash():
+    """ Return a hash of the source that prim_csr is compiled from. """
+    import hashlib
+    import inspect
+
+    source = ""
+    for func in (_sift_up, _sift_down, _prim_csr):
+        source += inspect.getsource(getattr(func, 'py_func', func))
+    return hashlib.sha256(source.encode()).hexdigest()
+
+def _load_prim_aot():
+    """ Return the prim_csr from the ahead-of-time build, or None if there is
+    no build or it was made from a different version of _prim_csr.
+    """
+    import os
+
+    try:
+        import prim_aot
+    except ImportError:
+        return None
+
+    #_build.py writes the source hash next to the module it builds
+    hash_path = os.path.join(os.path.dirname(prim_aot.__file__), 'prim_aot.sha256')
+    try:
+        with open(hash_path) as f:
+            built_hash = f.read().strip()
+    except OSError:
+        built_hash = None
+    #without the source there is no way to tell the build is current
+    try:
+        source_hash = _prim_csr_source_hash()
+    except OSError:
+        source_hash = None
+    if source_hash is None or built_hash != source_hash:
+        warnings.warn("prim_aot is out of date with _prim_csr, using the jit"
+                      " version; run python _build.py to rebuild it")
+        return None
+    return prim_aot.prim_csr
+
+#use the ahead-of-time build from _build.py if it is up to date, so that
+#prim_csr does not have to be compiled every time the script starts
+prim_csr = _load_prim_aot()
+if prim_csr is not None:
+    PRIM_CSR_BUILD = "aot"
+else:
+    PRIM_CSR_BUILD = "jit"
+    prim_csr = njit('i8[:](i4[:], i4[:], i4[:], i8)', cache=True)(_prim_csr)
+
+
+@njit('i8[:](i8[:, :])', cache=True)
+def prim_dense(W):
+    """ Run the O(V^2) array version of Prim on the matrix from
+    Graph.to_dense() and return the parent of each vertex (-1 for the root
+    of each component).
+
+    Each step scans the whole key array for the cheapest vertex not in the
+    tree, which on dense graphs beats a heap's O(E log V) bookkeeping.
+    """
+    n = W.shape[0]
+    key = np.full(n, INF, np.int64)
+    parent = np.full(n, -1, np.int64)
+    in_tree = np.zeros(n, np.bool_)
+    if n > 0:
+        key[0] = 0
+
+    for _ in range(n):
+        vertex = np.argmin(np.where(in_tree, INF, key))
+        if in_tree[vertex] or key[vertex] == INF:
+            #the current component is finished; start the next one at the
+            #first vertex not in the tree yet
+            vertex = np.argmin(in_tree)
+        in_tree[vertex] = True
+
+        #relax every vertex not in the tree that vertex offers a cheaper edge to
+        mask = ~in_tree & (W[vertex] < key)
+        key[mask] = W[vertex][mask]
+        parent[mask] = vertex
+
+    return parent
 
 
 import time
 
 if __name__ == "__main__":
-    my_graph = make_random_graph(10,45)
+    int_graph = make_random_int_graph(10,45)
+    my_graph = int_graph.to_graph()
     print("Done graph")
+    indptr, neighbors, weights = int_graph.to_csr()
     start_time = time.time()  # get start time
-    prim_w_heap(my_graph) # Call Prim
+    tree = prim_w_heap(indptr, neighbors, weights) # Call Prim
     end_time = time.time()  # Record the end time
     execution_time = end_time - start_time  # Calculate the execution time
+    print("WHATTTT", tree.tolist())
     print(f"Execution time for heap: {execution_time} seconds")
 
+    #build the cython heap on the fly; fall back to the python heaps if
+    #cython or a C compiler is not available
+    try:
+        import pyximport
+        pyximport.install(language_level=3)
+        import priority_queue_heap  # compile before the timer starts
+        start_time = time.time()  # Record the start time
+        tree = prim_w_cheap(indptr, neighbors, weights) # Call Prim
+        end_time = time.time()  # Record the end time
+        execution_time = end_time - start_time  # Calculate the execution time
+        print(f"Execution time for cython heap: {execution_time} seconds")
+    except ImportError:
+        print("Cython heap not available, skipping it")
+
+    start_time = time.time()  # Record the start time
+    parent = prim_csr(indptr, neighbors, weights, len(indptr)-1) # Call Prim
+    end_time = time.time()  # Record the end time
+    execution_time = end_time - start_time  # Calculate the execution time
+    print(f"Execution time for numba heap ({PRIM_CSR_BUILD}): {execution_time} seconds")
+
+    W = int_graph.to_dense()
+    start_time = time.time()  # Record the start time
+    parent = prim_dense(W) # Call Prim
+    end_time = time.time()  # Record the end time
+    execution_time = end_time - start_time  # Calculate the execution time
+    print(f"Execution time for dense array: {execution_time} seconds")
+
+    start_time = time.time()  # Record the start time
+    tree = prim_w_pqheap(my_graph) # Call Prim
+    end_time = time.time()  # Record the end time
+    execution_time = end_time - start_time  # Calculate the execution time
+    print("WHAT", tree.tolist())
+    print(f"Execution time for custom heap: {execution_time} seconds")
+
     start_time = time.time()  # Record the start time
-    prim_w_list(my_graph) # Call the function whose execution time you want to measure
+    tree = prim_w_list(my_graph) # Call the function whose execution time you want to measure
     end_time = time.time()  # Record the end time
     execution_time = end_time - start_time  # Calculate the execution time
+    print("WHAT", tree.tolist())
     print(f"Execution time for list: {execution_time} seconds")
 
@@ -0,0 +1,89 @@
+# cython: language_level=3
+""" A binary min-heap of (key, value) pairs of C longs, compiled with Cython.
+
+It is a typed stand-in for Priority_Queue_Heap, used by prim_w_cheap. The
+script builds it on the fly with pyximport.
+"""
+
+cimport cython
+import numpy as np
+
+
+cdef class CHeap:
+
+    cdef long[::1] keys
+    cdef long[::1] values
+    cdef Py_ssize_t size
+
+    def __init__(self, Py_ssize_t capacity=16):
+        self.keys = np.empty(max(capacity, 1), dtype='l')
+        self.values = np.empty(max(capacity, 1), dtype='l')
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    cdef void _grow(self):
+        #double the arrays, keeping the entries already in the heap
+        cdef Py_ssize_t capacity = 2 * self.keys.shape[0]
+        cdef long[::1] keys = np.empty(capacity, dtype='l')
+        cdef long[::1] values = np.empty(capacity, dtype='l')
+        keys[:self.size] = self.keys[:self.size]
+        values[:self.size] = self.values[:self.size]
+        self.keys = keys
+        self.values = values
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cpdef void push(self, long key, long val):
+        cdef Py_ssize_t i, parent
+
+        if self.size == self.keys.shape[0]:
+            self._grow()
+
+        #move parents down into the hole until the new key fits there
+        i = self.size
+        self.size += 1
+        while i > 0:
+            parent = (i-1) // 2
+            if self.keys[parent] <= key:
+                break
+            self.keys[i] = self.keys[parent]
+            self.values[i] = self.values[parent]
+            i = parent
+        self.keys[i] = key
+        self.values[i] = val
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cpdef (long, long) pop(self):
+        cdef long top_key, top_val, key, val
+        cdef Py_ssize_t i, kid
+
+        if self.size == 0:
+            raise IndexError("pop from an empty heap")
+
+        top_key = self.keys[0]
+        top_val = self.values[0]
+
+        #take the last entry out and move smaller kids up into the hole
+        #at the root until it fits there
+        self.size -= 1
+        key = self.keys[self.size]
+        val = self.values[self.size]
+        i = 0
+        while 2*i+1 < self.size:
+            kid = 2*i+1
+            if kid+1 < self.size and self.keys[kid+1] < self.keys[kid]:
+                kid += 1
+            if key <= self.keys[kid]:
+                break
+            self.keys[i] = self.keys[kid]
+            self.values[i] = self.values[kid]
+            i = kid
+        self.keys[i] = key
+        self.values[i] = val
+
+        return top_key, top_val